@@ -25,7 +25,11 @@ Usage:
 See https://github.com/projnanda for the official NANDA specification.
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .models import (
+    DeltaAction,
     NandaAdaptiveResolver,
     NandaAgentFacts,
     NandaAgentFactsDelta,
@@ -46,7 +50,9 @@ from .models import (
 )
 from .store import DeltaStore
 from .converter import AgentConverter, SimpleAgent, SimpleAgentConverter
-from .router import create_nanda_router, NandaBridge
+
+if TYPE_CHECKING:
+    from .router import create_nanda_router, NandaBridge
 
 __version__ = "0.2.0"
 __all__ = [
@@ -66,6 +72,7 @@ __all__ = [
     "NandaAgentFactsIndexResponse",
     "NandaAgentFactsDelta",
     "NandaAgentFactsDeltaResponse",
+    "DeltaAction",
     "NandaWellKnown",
     # Tool Models
     "NandaTool",
@@ -82,3 +89,14 @@ __all__ = [
     "create_nanda_router",
     "NandaBridge",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # The router pulls in FastAPI; import it on first use so models, store
+    # and converter can be used without paying for the web stack
+    if name in ("router", "create_nanda_router", "NandaBridge"):
+        # import_module, not "from . import router": the latter probes this
+        # hook for the submodule and would recurse
+        router = importlib.import_module(f"{__name__}.router")
+        return router if name == "router" else getattr(router, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -9,25 +9,88 @@ Implement the AgentConverter protocol to integrate with your registry.
 
 from __future__ import annotations
 
+import hashlib
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Iterator, Protocol, runtime_checkable
+from functools import cache, lru_cache
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Iterator, Protocol, Sequence, runtime_checkable
+from urllib.parse import urlsplit
+
+from pydantic import TypeAdapter
 
 from .models import (
-    NandaAdaptiveResolver,
+    CertificationLevel,
     NandaAgentFacts,
-    NandaAuthentication,
-    NandaCapabilities,
-    NandaCertification,
-    NandaEndpoints,
-    NandaEvaluations,
     NandaProvider,
-    NandaSkill,
-    NandaTelemetry,
 )
 
 
-@dataclass
+# Shared default for SimpleAgent.auth_methods (immutable, so never copied per agent)
+_DEFAULT_AUTH_METHODS: tuple[str, ...] = ("did-auth",)
+
+
+@lru_cache(maxsize=4096)
+def _compute_proof_digest(agent_id: str, namespace: str, version: str, registry_id: str) -> str:
+    """Hash the identifying fields of an agent for its proof placeholder."""
+    payload = f"{agent_id}:{namespace}:{version}:{registry_id}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _did_domain(url: str) -> str:
+    """Derive the did:web method-specific part for a URL.
+    
+    Drops the scheme and any userinfo, and keeps the host, port and path
+    exactly as written so existing DIDs stay stable. Values without a
+    scheme are used unchanged.
+    """
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return url
+    return f"{parts.netloc.rpartition('@')[2]}{parts.path}"
+
+
+def _skill_from_dict(skill_data: dict[str, Any]) -> dict[str, Any]:
+    """Build a skill entry from a skill dict."""
+    return {
+        "id": skill_data.get("id", skill_data.get("name", "unknown")),
+        "description": skill_data.get("description", ""),
+        "inputModes": skill_data.get("inputModes", ["text"]),
+        "outputModes": skill_data.get("outputModes", ["text"]),
+        "supportedLanguages": skill_data.get("supportedLanguages"),
+        "latencyBudgetMs": skill_data.get("latencyBudgetMs"),
+        "maxTokens": skill_data.get("maxTokens"),
+    }
+
+
+def _skill_from_str(skill_data: str) -> dict[str, Any]:
+    """Build a skill entry from a bare skill identifier."""
+    return {"id": skill_data, "description": skill_data}
+
+
+# Skill builders keyed by exact type; subclasses go through _find_skill_builder
+_SKILL_BUILDERS: dict[type, Callable[[Any], dict[str, Any]]] = {
+    dict: _skill_from_dict,
+    str: _skill_from_str,
+}
+
+
+def _find_skill_builder(skill_data: Any) -> Callable[[Any], dict[str, Any]] | None:
+    """Pick a skill builder for dict/str subclasses, or None to skip the entry."""
+    if isinstance(skill_data, dict):
+        return _skill_from_dict
+    if isinstance(skill_data, str):
+        return _skill_from_str
+    return None
+
+
+# Constant fields of x_<registry> endpoints_extended entries for dynamic URLs
+_HTTPS_DYNAMIC_ENDPOINT: dict[str, str] = {"protocol": "https", "description": "Dynamic Endpoint"}
+_HTTP_DYNAMIC_ENDPOINT: dict[str, str] = {"protocol": "http", "description": "Dynamic Endpoint"}
+
+
+@dataclass(slots=True)
 class SimpleAgent:
     """Simple agent data structure for basic use cases.
     
@@ -63,11 +126,11 @@ class SimpleAgent:
     # Optional - capabilities
     streaming: bool = False
     batch: bool = False
-    auth_methods: list[str] = field(default_factory=lambda: ["did-auth"])
+    auth_methods: Sequence[str] = _DEFAULT_AUTH_METHODS
     required_scopes: list[str] | None = None
     
     # Optional - certification (production NANDA)
-    certification_level: str = "self-declared"
+    certification_level: CertificationLevel = "self-declared"
     certification_issuer: str | None = None
     attestations: list[str] = field(default_factory=list)
     
@@ -80,6 +143,20 @@ class SimpleAgent:
     telemetry_enabled: bool = False
     telemetry_retention: str | None = None
     telemetry_sampling: float | None = None
+    
+    @classmethod
+    def from_json(cls, data: str | bytes) -> SimpleAgent:
+        """Parse and validate a SimpleAgent from a JSON document.
+        
+        Validates straight from the raw JSON, without an intermediate dict.
+        """
+        return _simple_agent_adapter().validate_json(data)
+
+
+@cache
+def _simple_agent_adapter() -> TypeAdapter[SimpleAgent]:
+    """Build the SimpleAgent validator once, on first use."""
+    return TypeAdapter(SimpleAgent)
 
 
 @runtime_checkable
@@ -111,6 +188,12 @@ class AgentConverter(Protocol):
             
             def is_public(self, agent: MyInternalAgent) -> bool:
                 return agent.visibility == "public"
+    
+    Converters may additionally define ``to_nanda_batch(agents)`` returning a
+    list of AgentFacts; the index endpoint uses it when present so a page is
+    converted in one call. Likewise ``list_public_agents(limit, offset)`` lets
+    the index page over public agents only (e.g. ``WHERE public`` in SQL)
+    instead of filtering each agent with ``is_public``.
     """
     
     def to_nanda(self, agent: Any) -> NandaAgentFacts:
@@ -175,19 +258,78 @@ class SimpleAgentConverter:
         self.base_url = base_url or provider_url
         self.did_method = did_method
         
+        # Provider identity is constant for the converter's lifetime
+        self._domain = _did_domain(provider_url)
+        self._provider_did = f"did:{did_method}:{self._domain}"
+        # Plain data, so each agent's facts get their own provider model
+        self._provider: dict[str, Any] = {
+            "name": provider_name,
+            "url": provider_url,
+            "did": self._provider_did,
+        }
+        
+        # Certification template for agents that keep the self-declared defaults
+        self._default_certification: dict[str, Any] = {
+            "level": "self-declared",
+            "issuer": provider_name,
+        }
+        
+        # Registry-derived strings reused by every conversion
+        self._x_key = f"x_{registry_id.replace('-', '_')}"
+        self._default_skill_id = f"urn:{registry_id}:agent"
+        self._default_skill_desc = f"{provider_name} agent"
+        
+        # Templates for agents that keep the default auth and skills; kept as
+        # plain data so validation gives every agent its own sub-models
+        self._default_authentication: dict[str, Any] = {"methods": _DEFAULT_AUTH_METHODS}
+        self._default_skill: dict[str, Any] = {
+            "id": self._default_skill_id,
+            "description": self._default_skill_desc,
+        }
+        
         # In-memory agent storage for simple use cases
         self._agents: dict[str, SimpleAgent] = {}
+        
+        # Converted facts and their JSON for registered agents, keyed by agent id
+        self._facts_cache: dict[str, tuple[SimpleAgent, NandaAgentFacts]] = {}
+        self._json_cache: dict[str, tuple[SimpleAgent, bytes]] = {}
     
     def register(self, agent: SimpleAgent) -> None:
-        """Register an agent (simple in-memory storage)."""
+        """Register an agent (simple in-memory storage).
+        
+        Re-register an agent after changing it so cached AgentFacts are rebuilt.
+        """
         self._agents[agent.id] = agent
+        self._invalidate(agent.id)
     
     def unregister(self, agent_id: str) -> None:
         """Unregister an agent."""
         self._agents.pop(agent_id, None)
+        self._invalidate(agent_id)
     
     def to_nanda(self, agent: SimpleAgent) -> NandaAgentFacts:
-        """Convert a SimpleAgent to NANDA AgentFacts format."""
+        """Convert a SimpleAgent to NANDA AgentFacts format.
+        
+        Results for registered agents are cached until the agent is
+        registered again or unregistered, so the returned facts are shared
+        and must not be mutated.
+        """
+        cached = self._facts_cache.get(agent.id)
+        if cached is not None and cached[0] is agent:
+            return cached[1]
+        
+        facts = self._build_facts(agent)
+        if self._agents.get(agent.id) is agent:
+            self._facts_cache[agent.id] = (agent, facts)
+        return facts
+    
+    def _build_facts(self, agent: SimpleAgent) -> NandaAgentFacts:
+        """Build NANDA AgentFacts for a SimpleAgent.
+        
+        The nested blocks are assembled as plain data and validated in a
+        single pass, instead of constructing each sub-model separately.
+        Validation copies list fields, so agent lists are passed as is.
+        """
         # Build DID
         did = self._build_did(agent)
         
@@ -198,160 +340,210 @@ class SimpleAgentConverter:
             agent_id=agent.id
         )
         
-        # Build provider
-        provider = NandaProvider(
-            name=self.provider_name,
-            url=self.provider_url,
-            did=f"did:{self.did_method}:{self.provider_url.replace('https://', '').replace('http://', '')}",
-        )
-        
         # Build endpoints
-        static_urls = list(agent.endpoints.values()) if agent.endpoints else []
+        static_urls = list(agent.endpoints.values())
         if self.base_url and not static_urls:
             static_urls = [f"{self.base_url}/agents/{agent.id}"]
-        dynamic_urls = list(agent.dynamic_endpoints)
+        dynamic_urls = agent.dynamic_endpoints
         
-        # Build adaptive resolver if configured
-        adaptive_resolver = None
-        if agent.adaptive_resolver_url:
-            adaptive_resolver = NandaAdaptiveResolver(
-                url=agent.adaptive_resolver_url,
-                policies=agent.adaptive_resolver_policies or ["capability_negotiation", "load_balancing"],
-            )
-        
-        endpoints = NandaEndpoints(
-            static=static_urls, 
-            dynamic=dynamic_urls,
-            adaptive_resolver=adaptive_resolver,
-        )
+        # Optional resolver/trust/telemetry blocks; most agents set none of them
+        certification: dict[str, Any]
+        if self._has_extensions(agent):
+            adaptive_resolver, certification, evaluations, telemetry = self._build_extensions(agent)
+        else:
+            adaptive_resolver = evaluations = telemetry = None
+            certification = self._default_certification
+        
+        endpoints = {
+            "static": static_urls,
+            "dynamic": dynamic_urls,
+            "adaptive_resolver": adaptive_resolver,
+        }
         
         # Build extended endpoint metadata for x_<registry>
-        endpoints_extended: list[dict[str, Any]] = []
-        if agent.endpoints:
-            for key, url in agent.endpoints.items():
-                endpoints_extended.append({
-                    "url": url,
-                    "protocol": "https" if str(url).startswith("https") else "http",
-                    "description": key.replace("_", " ").title(),
-                    "key": key,
-                })
-        for idx, url in enumerate(dynamic_urls):
-            endpoints_extended.append({
+        endpoints_extended: list[dict[str, Any]] = [
+            {
+                "url": url,
+                "protocol": "https" if url.startswith("https") else "http",
+                "description": key.replace("_", " ").title(),
+                "key": key,
+            }
+            for key, url in agent.endpoints.items()
+        ]
+        endpoints_extended += [
+            {
                 "url": url,
-                "protocol": "https" if str(url).startswith("https") else "http",
-                "description": "Dynamic Endpoint",
+                **(_HTTPS_DYNAMIC_ENDPOINT if url.startswith("https") else _HTTP_DYNAMIC_ENDPOINT),
                 "key": f"dynamic_{idx}",
-            })
+            }
+            for idx, url in enumerate(dynamic_urls)
+        ]
         
         # Build authentication
-        authentication = NandaAuthentication(
-            methods=agent.auth_methods,
-            requiredScopes=agent.required_scopes,
-        )
+        authentication: dict[str, Any]
+        if agent.auth_methods is _DEFAULT_AUTH_METHODS and agent.required_scopes is None:
+            authentication = self._default_authentication
+        else:
+            authentication = {
+                "methods": agent.auth_methods,
+                "requiredScopes": agent.required_scopes,
+            }
         
-        # Build skill identifiers for capabilities.skills
-        skill_ids = []
+        # Build skill identifiers for capabilities.skills and detailed skills
+        # in one pass over agent.skills
+        skill_ids: list[str] = []
+        skills: list[dict[str, Any]] = []
         for skill_data in agent.skills:
-            if isinstance(skill_data, dict):
-                skill_ids.append(skill_data.get("id", skill_data.get("name", "unknown")))
-            elif isinstance(skill_data, str):
-                skill_ids.append(skill_data)
+            build_skill = _SKILL_BUILDERS.get(type(skill_data)) or _find_skill_builder(skill_data)
+            if build_skill is not None:
+                skill = build_skill(skill_data)
+                skill_ids.append(skill["id"])
+                skills.append(skill)
         
         # Build capabilities (production NANDA format)
-        capabilities = NandaCapabilities(
-            modalities=list(agent.labels),
-            skills=skill_ids,
-            authentication=authentication,
-            streaming=agent.streaming,
-            batch=agent.batch,
-        )
-        
-        # Build detailed skills
-        skills = []
-        for skill_data in agent.skills:
-            if isinstance(skill_data, dict):
-                skills.append(NandaSkill(
-                    id=skill_data.get("id", skill_data.get("name", "unknown")),
-                    description=skill_data.get("description", ""),
-                    inputModes=skill_data.get("inputModes", ["text"]),
-                    outputModes=skill_data.get("outputModes", ["text"]),
-                    supportedLanguages=skill_data.get("supportedLanguages"),
-                    latencyBudgetMs=skill_data.get("latencyBudgetMs"),
-                    maxTokens=skill_data.get("maxTokens"),
-                ))
-            elif isinstance(skill_data, str):
-                skills.append(NandaSkill(id=skill_data, description=skill_data))
+        capabilities = {
+            "modalities": agent.labels,
+            "skills": skill_ids,
+            "authentication": authentication,
+            "streaming": agent.streaming,
+            "batch": agent.batch,
+        }
         
         # Default skill if none specified
         if not skills:
-            skills.append(NandaSkill(
-                id=f"urn:{self.registry_id}:agent",
-                description=f"{self.provider_name} agent"
-            ))
+            skills.append(self._default_skill)
         
-        # Build certification (production NANDA)
-        certification = NandaCertification(
-            level=agent.certification_level,
-            issuer=agent.certification_issuer or self.provider_name,
-            attestations=agent.attestations,
+        # Build metadata with registry extensions; agent metadata overrides
+        # the generated keys and is only merged in when present
+        extension: dict[str, Any] = {
+            "namespace": agent.namespace,
+            "original_id": agent.id,
+            "public": agent.public,
+            "classification": agent.classification,
+            "card_template": agent.card_template,
+            "endpoints_extended": endpoints_extended,
+        }
+        if agent.metadata:
+            extension.update(agent.metadata)
+        metadata = {self._x_key: extension}
+        
+        proof = self._build_proof(agent)
+        
+        return NandaAgentFacts.model_validate({
+            "id": did,
+            "handle": handle,
+            "agent_name": agent.name,
+            "label": agent.labels[0] if agent.labels else agent.namespace,
+            "description": agent.description,
+            "version": agent.version,
+            "provider": self._provider,
+            "endpoints": endpoints,
+            "capabilities": capabilities,
+            "skills": skills,
+            "certification": certification,
+            "evaluations": evaluations,
+            "telemetry": telemetry,
+            "metadata": metadata,
+            "proof": proof,
+        })
+    
+    def to_nanda_json(self, agent: SimpleAgent) -> bytes:
+        """Convert a SimpleAgent to NANDA AgentFacts serialized as JSON bytes.
+        
+        Serializes straight from the model to bytes in pydantic-core, without
+        an intermediate Python dict or str. Like to_nanda, results for
+        registered agents are cached until the agent changes.
+        """
+        cached = self._json_cache.get(agent.id)
+        if cached is not None and cached[0] is agent:
+            return cached[1]
+        
+        payload = NandaAgentFacts.__pydantic_serializer__.to_json(self.to_nanda(agent))
+        if self._agents.get(agent.id) is agent:
+            self._json_cache[agent.id] = (agent, payload)
+        return payload
+    
+    @staticmethod
+    def _has_extensions(agent: SimpleAgent) -> bool:
+        """Check whether an agent sets any optional resolver, trust or telemetry field."""
+        return bool(
+            agent.adaptive_resolver_url
+            or agent.certification_level != "self-declared"
+            or agent.certification_issuer
+            or agent.attestations
+            or agent.performance_score is not None
+            or agent.availability_90d
+            or agent.audit_trail
+            or agent.telemetry_enabled
         )
+    
+    def _build_extensions(
+        self, agent: SimpleAgent
+    ) -> tuple[dict[str, Any] | None, dict[str, Any], dict[str, Any] | None, dict[str, Any] | None]:
+        """Build the adaptive resolver, certification, evaluations and telemetry blocks."""
+        # Build adaptive resolver if configured
+        adaptive_resolver = None
+        if agent.adaptive_resolver_url:
+            adaptive_resolver = {
+                "url": agent.adaptive_resolver_url,
+                "policies": agent.adaptive_resolver_policies or ["capability_negotiation", "load_balancing"],
+            }
+        
+        # Build certification (production NANDA)
+        certification = {
+            "level": agent.certification_level,
+            "issuer": agent.certification_issuer or self.provider_name,
+            "attestations": agent.attestations,
+        }
         
         # Build evaluations if any metrics provided
         evaluations = None
         if agent.performance_score is not None or agent.availability_90d or agent.audit_trail:
-            evaluations = NandaEvaluations(
-                performanceScore=agent.performance_score,
-                availability90d=agent.availability_90d,
-                auditTrail=agent.audit_trail,
-            )
+            evaluations = {
+                "performanceScore": agent.performance_score,
+                "availability90d": agent.availability_90d,
+                "auditTrail": agent.audit_trail,
+            }
         
         # Build telemetry if enabled
         telemetry = None
         if agent.telemetry_enabled:
-            telemetry = NandaTelemetry(
-                enabled=True,
-                retention=agent.telemetry_retention,
-                sampling=agent.telemetry_sampling,
-            )
-        
-        # Build metadata with registry extensions
-        metadata = {
-            f"x_{self.registry_id.replace('-', '_')}": {
-                "namespace": agent.namespace,
-                "original_id": agent.id,
-                "public": agent.public,
-                "classification": agent.classification,
-                "card_template": agent.card_template,
-                "endpoints_extended": endpoints_extended,
-                **agent.metadata,
+            telemetry = {
+                "enabled": True,
+                "retention": agent.telemetry_retention,
+                "sampling": agent.telemetry_sampling,
             }
-        }
         
-        proof = self._build_proof(agent)
-        
-        return NandaAgentFacts(
-            id=did,
-            handle=handle,
-            agent_name=agent.name,
-            label=agent.labels[0] if agent.labels else agent.namespace,
-            description=agent.description,
-            version=agent.version,
-            provider=provider,
-            endpoints=endpoints,
-            capabilities=capabilities,
-            skills=skills,
-            certification=certification,
-            evaluations=evaluations,
-            telemetry=telemetry,
-            metadata=metadata,
-            proof=proof,
-        )
+        return adaptive_resolver, certification, evaluations, telemetry
+    
+    def to_nanda_batch(self, agents: Iterable[SimpleAgent]) -> list[NandaAgentFacts]:
+        """Convert several SimpleAgents to NANDA AgentFacts format."""
+        return [self.to_nanda(agent) for agent in agents]
     
     def list_agents(self, limit: int = 100, offset: int = 0) -> Iterator[SimpleAgent]:
-        """List registered agents."""
-        agents = list(self._agents.values())
-        for agent in agents[offset:offset + limit]:
-            yield agent
+        """List registered agents in registration order.
+        
+        Slices the agent map directly (dicts preserve insertion order), so a
+        page costs O(offset + limit) instead of copying every agent. The page
+        is snapshotted up front so concurrent registrations can't invalidate
+        the iterator while the caller converts agents.
+        """
+        yield from list(islice(self._agents.values(), offset, offset + limit))
+    
+    def list_public_agents(self, limit: int = 100, offset: int = 0) -> Iterator[SimpleAgent]:
+        """List public agents in registration order.
+        
+        Offset and limit apply after filtering, so pages are always full
+        until the public agents run out. A page costs O(agents scanned up to
+        the end of the page), not a copy of the whole agent map; the filter
+        runs in C and the page is snapshotted as with list_agents.
+        """
+        # Read the public flag directly unless a subclass overrides is_public
+        if type(self).is_public is SimpleAgentConverter.is_public:
+            is_public: Callable[[SimpleAgent], bool] = attrgetter("public")
+        else:
+            is_public = self.is_public
+        yield from list(islice(filter(is_public, self._agents.values()), offset, offset + limit))
     
     def get_agent(self, agent_id: str) -> SimpleAgent | None:
         """Get a specific agent by ID."""
@@ -361,17 +553,18 @@ class SimpleAgentConverter:
         """Check if an agent is public."""
         return agent.public
     
+    def _invalidate(self, agent_id: str) -> None:
+        """Drop cached conversions for an agent."""
+        self._facts_cache.pop(agent_id, None)
+        self._json_cache.pop(agent_id, None)
+    
     def _build_did(self, agent: SimpleAgent) -> str:
         """Build a DID for the agent."""
-        domain = self.provider_url.replace("https://", "").replace("http://", "")
-        return f"did:{self.did_method}:{domain}:agents:{agent.namespace}:{agent.id}"
+        return f"did:{self.did_method}:{self._domain}:agents:{agent.namespace}:{agent.id}"
 
     def _build_proof(self, agent: SimpleAgent) -> dict[str, Any]:
         """Create a lightweight, non-secret proof placeholder."""
-        import hashlib
-        
-        payload = f"{agent.id}:{agent.namespace}:{agent.version}:{self.registry_id}"
-        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        digest = _compute_proof_digest(agent.id, agent.namespace, agent.version, self.registry_id)
         return {
             "method": "sha256",
             "digest": digest,
@@ -425,6 +618,13 @@ class AbstractAgentConverter(ABC):  # pragma: no cover - interface helpers only
         """Convert an internal agent to NANDA format."""
         pass
     
+    def to_nanda_batch(self, agents: Iterable[Any]) -> list[NandaAgentFacts]:
+        """Convert several internal agents to NANDA format.
+        
+        Override to fetch related data for the whole batch at once.
+        """
+        return [self.to_nanda(agent) for agent in agents]
+    
     @abstractmethod
     def list_agents(self, limit: int, offset: int) -> Iterator[Any]:
         """List agents from your registry."""
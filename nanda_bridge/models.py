@@ -10,9 +10,29 @@ See: https://github.com/projnanda/agentfacts-format
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from enum import Enum
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Closed vocabularies from the NANDA spec
+CertificationLevel = Literal["self-declared", "verified", "audited"]
+
+
+class DeltaAction(str, Enum):
+    """Delta action types.
+    
+    Members are strings, so they compare equal to and serialize as
+    "upsert", "delete" and "revoke".
+    """
+    UPSERT = "upsert"
+    DELETE = "delete"
+    REVOKE = "revoke"
+    
+    def __str__(self) -> str:
+        # Enum would render "DeltaAction.UPSERT"; keep the bare value instead
+        return str(self.value)
 
 
 class NandaProvider(BaseModel):
@@ -110,7 +130,7 @@ class NandaCertification(BaseModel):
     Levels: "self-declared", "verified", "audited"
    
     """
-    level: str = Field(..., description="Certification level: 'self-declared', 'verified', 'audited'")
+    level: CertificationLevel = Field(..., description="Certification level: 'self-declared', 'verified', 'audited'")
     issuer: str | None = Field(None, description="Certification issuer (e.g., 'NANDA')")
     attestations: list[str] = Field(
         default_factory=list, 
@@ -231,10 +251,13 @@ class NandaAgentFactsIndexResponse(BaseModel):
 class NandaAgentFactsDelta(BaseModel):
     """Single delta entry representing an agent change.
     
-    Used for incremental sync between registries.
+    Used for incremental sync between registries. Deltas are immutable
+    once recorded, since every poller is handed the same instances.
     """
+    model_config = ConfigDict(frozen=True)
+    
     seq: int = Field(..., description="Sequence number (monotonically increasing)")
-    action: str = Field(..., description="Action type: 'upsert', 'delete', 'revoke'")
+    action: DeltaAction = Field(..., description="Action type: 'upsert', 'delete', 'revoke'")
     recorded_at: datetime = Field(..., description="When the change was recorded")
     agent: NandaAgentFacts = Field(..., description="Agent data (for upsert)")
     
@@ -5,6 +5,7 @@ FastAPI router implementing standard NANDA endpoints.
 
 Provides:
 - /nanda/index - List all public agents
+- /nanda/index.ndjson - Stream public agents, one JSON document per line
 - /nanda/resolve - Resolve a single agent
 - /nanda/deltas - Get change feed for sync
 - /nanda/tools - List available MCP tools
@@ -13,13 +14,17 @@ Provides:
 
 from __future__ import annotations
 
+import time
 from datetime import UTC, datetime
-from typing import Any, Callable
+from functools import lru_cache
+from typing import Any, Callable, Iterator
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
-from .converter import AgentConverter, SimpleAgentConverter
+from .converter import AgentConverter, SimpleAgent, SimpleAgentConverter, _did_domain
 from .models import (
+    DeltaAction,
     NandaAgentFacts,
     NandaAgentFactsDeltaResponse,
     NandaAgentFactsIndexResponse,
@@ -30,6 +35,27 @@ from .models import (
 )
 from .store import DeltaStore
 
+# generated_at tolerates some drift, so concurrent requests share one timestamp
+_NOW_TICK = 0.1
+_now_cache: tuple[float, datetime] = (float("-inf"), datetime.now(UTC))
+
+
+def _coarse_now() -> datetime:
+    """Return the current UTC time, refreshed at most every _NOW_TICK seconds."""
+    global _now_cache
+    tick, now = _now_cache
+    t = time.monotonic()
+    if t - tick >= _NOW_TICK:
+        now = datetime.now(UTC)
+        _now_cache = (t, now)
+    return now
+
+
+@lru_cache(maxsize=1024)
+def _default_namespaces(provider_url: str) -> tuple[str, ...]:
+    """Default DID namespaces for a provider, shared across routers."""
+    return (f"did:web:{_did_domain(provider_url)}:*",)
+
 
 def create_nanda_router(
     converter: AgentConverter,
@@ -81,10 +107,27 @@ def create_nanda_router(
         app = FastAPI()
         app.include_router(router)
     """
+    # Endpoints declare response_model and keep FastAPI's default response
+    # class, so responses are serialized to JSON bytes by pydantic-core
     router = APIRouter(prefix=prefix, tags=["nanda"])
     
-    tools = tools or []
-    namespaces = namespaces or [f"did:web:{provider_url.replace('https://', '')}:*"]
+    # Keep the caller's list so tools added later (NandaBridge.add_tool) are served
+    tools = tools if tools is not None else []
+    namespaces = namespaces or list(_default_namespaces(provider_url))
+    
+    list_public_agents = getattr(converter, "list_public_agents", None)
+    
+    def iter_public_agents(limit: int, offset: int) -> Iterator[Any]:
+        # Let the converter filter at the storage layer when it can. Paging
+        # then counts public agents only; the list_agents fallback pages over
+        # all agents and drops private ones, so its pages can come up short
+        if list_public_agents is not None:
+            return iter(list_public_agents(limit=limit, offset=offset))
+        return (
+            agent
+            for agent in converter.list_agents(limit=limit, offset=offset)
+            if converter.is_public(agent)
+        )
     
     @router.get("/index", response_model=NandaAgentFactsIndexResponse)
     def nanda_index(
@@ -95,20 +138,54 @@ def create_nanda_router(
         
         This endpoint returns all publicly visible agents in the registry,
         formatted according to the NANDA AgentFacts specification.
+        
+        offset counts public agents when the converter provides
+        list_public_agents (as SimpleAgentConverter does), and all agents
+        otherwise.
         """
-        agents: list[NandaAgentFacts] = []
+        public_agents = list(iter_public_agents(limit, offset))
         
-        for agent in converter.list_agents(limit=limit, offset=offset):
-            if converter.is_public(agent):
-                agents.append(converter.to_nanda(agent))
+        # Convert the whole page in one call when the converter supports it
+        to_nanda_batch = getattr(converter, "to_nanda_batch", None)
+        agents: list[NandaAgentFacts]
+        if to_nanda_batch is not None:
+            agents = to_nanda_batch(public_agents)
+        else:
+            agents = [converter.to_nanda(agent) for agent in public_agents]
         
-        return NandaAgentFactsIndexResponse(
-            generated_at=datetime.now(UTC),
+        # Envelope contents are already validated, so skip re-validation
+        return NandaAgentFactsIndexResponse.model_construct(
+            generated_at=_coarse_now(),
             registry_id=registry_id,
             agents=agents,
             total_count=len(agents),
         )
     
+    @router.get("/index.ndjson", response_class=StreamingResponse)
+    def nanda_index_ndjson(
+        limit: int = Query(100, ge=1, le=500),
+        offset: int = Query(0, ge=0),
+    ) -> StreamingResponse:
+        """Stream public agents as newline-delimited AgentFacts JSON.
+        
+        Same page (and offset semantics) as /index, but each agent is
+        converted and written as it is reached, so the converted AgentFacts
+        are never collected into one response body. Converters may still
+        snapshot the page of source agents up front, as SimpleAgentConverter
+        does.
+        """
+        to_nanda_json = getattr(converter, "to_nanda_json", None)
+        
+        def lines() -> Iterator[bytes]:
+            for agent in iter_public_agents(limit, offset):
+                if to_nanda_json is not None:
+                    payload = to_nanda_json(agent)
+                else:
+                    payload = NandaAgentFacts.__pydantic_serializer__.to_json(converter.to_nanda(agent))
+                yield payload + b"\n"
+        
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    
     @router.get("/resolve", response_model=NandaAgentFacts)
     def nanda_resolve(
         agent: str = Query(..., description="Agent ID, DID, or handle"),
@@ -145,9 +222,9 @@ def create_nanda_router(
         """
         deltas = delta_store.since(since)
         
-        return NandaAgentFactsDeltaResponse(
+        return NandaAgentFactsDeltaResponse.model_construct(
             registry_id=registry_id,
-            generated_at=datetime.now(UTC),
+            generated_at=_coarse_now(),
             deltas=deltas,
             next_seq=delta_store.next_seq,
         )
@@ -158,11 +235,36 @@ def create_nanda_router(
         
         Returns tools that agents in this registry can use.
         """
-        return NandaToolsResponse(
+        return NandaToolsResponse.model_construct(
             registry_id=registry_id,
             tools=tools,
         )
     
+    # The discovery document only varies with whether any tools are advertised
+    wellknown_cache: dict[bool, NandaWellKnown] = {}
+    
+    # Fields derived from the router arguments never change, so format them once
+    registry_did = f"did:web:{_did_domain(base_url)}"
+    endpoint_base = f"{base_url}{prefix}"
+    index_url = f"{endpoint_base}/index"
+    resolve_url = f"{endpoint_base}/resolve"
+    deltas_url = f"{endpoint_base}/deltas"
+    tools_url = f"{endpoint_base}/tools"
+    provider = NandaProvider.model_construct(name=provider_name, url=provider_url)
+    
+    def build_wellknown() -> NandaWellKnown:
+        return NandaWellKnown.model_construct(
+            registry_id=registry_id,
+            registry_did=registry_did,
+            namespaces=namespaces,
+            index_url=index_url,
+            resolve_url=resolve_url,
+            deltas_url=deltas_url,
+            tools_url=tools_url if tools else None,
+            provider=provider,
+            capabilities=["agentfacts", "deltas"] + (["mcp-tools"] if tools else []),
+        )
+    
     # Well-known endpoint (note: no prefix, mounted separately)
     @router.get("/.well-known/nanda.json", response_model=NandaWellKnown)
     def nanda_wellknown() -> NandaWellKnown:
@@ -170,20 +272,11 @@ def create_nanda_router(
         
         Other registries use this to discover and federate with this registry.
         """
-        return NandaWellKnown(
-            registry_id=registry_id,
-            registry_did=f"did:web:{base_url.replace('https://', '').replace('http://', '')}",
-            namespaces=namespaces,
-            index_url=f"{base_url}{prefix}/index",
-            resolve_url=f"{base_url}{prefix}/resolve",
-            deltas_url=f"{base_url}{prefix}/deltas",
-            tools_url=f"{base_url}{prefix}/tools" if tools else None,
-            provider=NandaProvider(
-                name=provider_name,
-                url=provider_url,
-            ),
-            capabilities=["agentfacts", "deltas"] + (["mcp-tools"] if tools else []),
-        )
+        has_tools = bool(tools)
+        wellknown = wellknown_cache.get(has_tools)
+        if wellknown is None:
+            wellknown = wellknown_cache[has_tools] = build_wellknown()
+        return wellknown
     
     return router
 
@@ -198,24 +291,14 @@ def _parse_agent_identifier(value: str, registry_id: str) -> str:
     - Namespaced: "namespace:my-agent" -> "my-agent"
     """
     # Handle format: @registry/agent or @registry:namespace/agent
-    if value.startswith("@"):
-        # @registry/agent
-        if "/" in value:
-            return value.split("/")[-1]
-        return value[1:]  # Remove @ prefix
-    
-    # DID format: did:method:...
-    if value.startswith("did:"):
-        parts = value.split(":")
-        # Last part is typically the agent ID
-        return parts[-1]
-    
-    # Namespaced format: namespace:agent
-    if ":" in value and not value.startswith("did:"):
-        return value.split(":")[-1]
+    if value[:1] == "@":
+        slash = value.rfind("/")
+        return value[slash + 1:] if slash >= 0 else value[1:]
     
-    # Simple ID
-    return value
+    # DID (did:method:...:agent) and namespaced (namespace:agent) formats both
+    # end with the agent ID after the last colon; a simple ID has no colon
+    colon = value.rfind(":")
+    return value[colon + 1:] if colon >= 0 else value
 
 
 class NandaBridge:
@@ -244,8 +327,23 @@ class NandaBridge:
         # Mount the router
         app = FastAPI()
         app.include_router(bridge.router)
+    
+    Subclasses that add attributes must declare their own __slots__
+    (or include "__dict__" in them).
     """
     
+    __slots__ = (
+        "registry_id",
+        "provider_name",
+        "provider_url",
+        "base_url",
+        "converter",
+        "delta_store",
+        "tools",
+        "_wellknown",
+        "router",
+    )
+    
     def __init__(
         self,
         registry_id: str,
@@ -291,6 +389,9 @@ class NandaBridge:
         # Store tools
         self.tools = tools or []
         
+        # Discovery document, built on first access and reset by add_tool
+        self._wellknown: NandaWellKnown | None = None
+        
         # Create router
         self.router = create_nanda_router(
             converter=self.converter,
@@ -310,7 +411,9 @@ class NandaBridge:
             agent: Agent to register (SimpleAgent or your custom type)
             
         Returns:
-            NANDA AgentFacts for the registered agent
+            A copy of the NANDA AgentFacts for the registered agent; the
+            instance served by /resolve, /index and the delta stays private
+            to the bridge, so changing the copy does not leak into them
         """
         # If using SimpleAgentConverter, register directly
         if isinstance(self.converter, SimpleAgentConverter):
@@ -321,9 +424,28 @@ class NandaBridge:
         
         # Record delta
         if self.converter.is_public(agent):
-            self.delta_store.add("upsert", nanda_facts)
+            self.delta_store.add(DeltaAction.UPSERT, nanda_facts)
+        
+        return nanda_facts.model_copy(deep=True)
+    
+    def register_agent_json(self, data: str | bytes) -> NandaAgentFacts:
+        """Register a SimpleAgent given as a JSON document.
         
-        return nanda_facts
+        The document is validated straight from JSON (no intermediate dict)
+        and then registered as with register_agent.
+        
+        Args:
+            data: JSON object with SimpleAgent fields
+            
+        Returns:
+            NANDA AgentFacts for the registered agent
+            
+        Raises:
+            TypeError: If the bridge uses a custom converter
+        """
+        if not isinstance(self.converter, SimpleAgentConverter):
+            raise TypeError("register_agent_json requires a SimpleAgentConverter")
+        return self.register_agent(SimpleAgent.from_json(data))
     
     def unregister_agent(self, agent_id: str) -> None:
         """Unregister an agent and record a delete delta.
@@ -333,29 +455,39 @@ class NandaBridge:
         """
         # Get agent before deletion for delta
         agent = self.converter.get_agent(agent_id)
+        if agent is None:
+            return
         
-        if agent is not None:
-            nanda_facts = self.converter.to_nanda(agent)
-            
-            # If using SimpleAgentConverter, unregister directly
-            if isinstance(self.converter, SimpleAgentConverter):
-                self.converter.unregister(agent_id)
-            
-            # Record delete delta
-            if self.converter.is_public(agent):
-                self.delta_store.add("delete", nanda_facts)
+        # Only public agents get a delta, so only they need converting
+        public = self.converter.is_public(agent)
+        nanda_facts = self.converter.to_nanda(agent) if public else None
+        
+        # If using SimpleAgentConverter, unregister directly
+        if isinstance(self.converter, SimpleAgentConverter):
+            self.converter.unregister(agent_id)
+        
+        # Record delete delta
+        if nanda_facts is not None:
+            self.delta_store.add(DeltaAction.DELETE, nanda_facts)
     
     def add_tool(self, tool: NandaTool) -> None:
         """Add an MCP tool to advertise."""
         self.tools.append(tool)
+        self._wellknown = None
     
     @property
     def wellknown(self) -> NandaWellKnown:
         """Get the well-known discovery document."""
+        if self._wellknown is None:
+            self._wellknown = self._build_wellknown()
+        return self._wellknown
+    
+    def _build_wellknown(self) -> NandaWellKnown:
+        """Build the well-known discovery document."""
         return NandaWellKnown(
             registry_id=self.registry_id,
-            registry_did=f"did:web:{self.base_url.replace('https://', '').replace('http://', '')}",
-            namespaces=[f"did:web:{self.provider_url.replace('https://', '')}:*"],
+            registry_did=f"did:web:{_did_domain(self.base_url)}",
+            namespaces=list(_default_namespaces(self.provider_url)),
             index_url=f"{self.base_url}/nanda/index",
             resolve_url=f"{self.base_url}/nanda/resolve",
             deltas_url=f"{self.base_url}/nanda/deltas",
@@ -10,16 +10,28 @@ For production use, extend this class to persist deltas to a database.
 from __future__ import annotations
 
 import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, nullcontext
 from datetime import UTC, datetime
-from typing import Any, Protocol
+from itertools import islice
+from typing import Any, Callable, Iterable, Protocol, TypeVar
 
-from .models import NandaAgentFacts, NandaAgentFactsDelta
+from .models import DeltaAction, NandaAgentFacts, NandaAgentFactsDelta
+
+
+# Lock-free read attempts before falling back to the store lock (or, for
+# stores without a lock, before yielding to the writer between attempts)
+_OPTIMISTIC_READS = 3
+
+_T = TypeVar("_T")
 
 
 class DeltaStoreProtocol(Protocol):
     """Protocol for delta store implementations."""
     
-    def add(self, action: str, agent: NandaAgentFacts) -> NandaAgentFactsDelta:
+    def add(self, action: DeltaAction | str, agent: NandaAgentFacts) -> NandaAgentFactsDelta:
         """Record a new delta."""
         ...
     
@@ -39,6 +51,9 @@ class DeltaStore:
     Thread-safe implementation suitable for development and testing.
     For production, subclass and override to persist to a database.
     
+    Recorded deltas are frozen; to attach signatures, override _sign,
+    which runs on each new delta before it is stored.
+    
     Usage:
         store = DeltaStore()
         
@@ -52,18 +67,25 @@ class DeltaStore:
         next_seq = store.next_seq
     """
     
-    def __init__(self, max_deltas: int = 10000):
+    def __init__(self, max_deltas: int = 10000, thread_safe: bool = True):
         """Initialize the delta store.
         
         Args:
             max_deltas: Maximum number of deltas to retain (oldest are pruned)
+            thread_safe: Lock around writes; pass False only when a single
+                thread ever records deltas (readers then retry their
+                version-checked reads instead of falling back to a lock)
         """
-        self._lock = threading.Lock()
+        self._thread_safe = thread_safe
+        self._lock: AbstractContextManager[Any] = threading.Lock() if thread_safe else nullcontext()
         self._seq = 0
-        self._deltas: list[NandaAgentFactsDelta] = []
+        # Seqlock counter: odd while a writer is mutating _deltas
+        self._version = 0
+        # Bounded deque: appending past max_deltas drops the oldest in O(1)
+        self._deltas: deque[NandaAgentFactsDelta] = deque(maxlen=max_deltas)
         self._max_deltas = max_deltas
     
-    def add(self, action: str, agent: NandaAgentFacts) -> NandaAgentFactsDelta:
+    def add(self, action: DeltaAction | str, agent: NandaAgentFacts) -> NandaAgentFactsDelta:
         """Record a new delta.
         
         Args:
@@ -72,23 +94,64 @@ class DeltaStore:
             
         Returns:
             The created delta with assigned sequence number
+            
+        Raises:
+            ValueError: If action is not a DeltaAction value
         """
+        # Resolve the action once, outside the lock
+        action = DeltaAction(action)
         with self._lock:
-            self._seq += 1
+            seq = self._seq + 1
             delta = NandaAgentFactsDelta(
-                seq=self._seq,
+                seq=seq,
                 action=action,
                 recorded_at=datetime.now(UTC),
                 agent=agent,
                 signature=None,
             )
+            delta = self._signed(delta)
+            self._version += 1
             self._deltas.append(delta)
+            # Publish the seq only once its delta is stored (readers don't lock)
+            self._seq = seq
+            self._version += 1
+            return delta
+    
+    def add_batch(
+        self,
+        items: Iterable[tuple[DeltaAction | str, NandaAgentFacts]],
+    ) -> list[NandaAgentFactsDelta]:
+        """Record several deltas under a single lock acquisition.
+        
+        Args:
+            items: (action, agent) pairs, recorded in order
             
-            # Prune old deltas if needed
-            if len(self._deltas) > self._max_deltas:
-                self._deltas = self._deltas[-self._max_deltas:]
+        Returns:
+            The created deltas with consecutive sequence numbers
             
-            return delta
+        Raises:
+            ValueError: If any action is not a DeltaAction value
+        """
+        resolved = [(DeltaAction(action), agent) for action, agent in items]
+        with self._lock:
+            seq = self._seq
+            # The whole batch is recorded at one instant
+            recorded_at = datetime.now(UTC)
+            deltas = []
+            for action, agent in resolved:
+                seq += 1
+                deltas.append(self._signed(NandaAgentFactsDelta(
+                    seq=seq,
+                    action=action,
+                    recorded_at=recorded_at,
+                    agent=agent,
+                    signature=None,
+                )))
+            self._version += 1
+            self._deltas.extend(deltas)
+            self._seq = seq
+            self._version += 1
+            return deltas
     
     def since(self, seq: int) -> list[NandaAgentFactsDelta]:
         """Get all deltas since a sequence number.
@@ -99,8 +162,54 @@ class DeltaStore:
         Returns:
             List of deltas with seq > the provided value
         """
-        with self._lock:
-            return [d for d in self._deltas if d.seq > seq]
+        # Caught-up pollers are the common case
+        if seq >= self._seq:
+            return []
+        
+        return self._read(self._slice_since, seq)
+    
+    def _read(self, read: Callable[[int], _T], seq: int) -> _T:
+        """Run a reader without the lock, seqlock style.
+        
+        The result is kept only if no writer started or finished while it
+        ran. After _OPTIMISTIC_READS collisions the read is repeated under
+        the lock; a store without a real lock keeps retrying instead,
+        yielding to the writer between attempts.
+        """
+        attempts = 0
+        while True:
+            version = self._version
+            if not version & 1:
+                try:
+                    result = read(seq)
+                except (IndexError, RuntimeError):
+                    # Head evicted or deque mutated while being read
+                    pass
+                else:
+                    if self._version == version:
+                        return result
+            attempts += 1
+            if attempts >= _OPTIMISTIC_READS:
+                if self._thread_safe:
+                    with self._lock:
+                        return read(seq)
+                time.sleep(0)
+    
+    def _slice_since(self, seq: int) -> list[NandaAgentFactsDelta]:
+        """Copy the deltas with seq > the provided value."""
+        deltas = self._deltas
+        if not deltas:
+            return []
+        # Stored seqs are contiguous, so the result size is a subtraction
+        wanted = deltas[-1].seq - seq
+        if wanted <= 0:
+            return []
+        if wanted >= len(deltas):
+            return list(deltas)
+        # Walk in from the tail so near-current polls cost O(wanted)
+        tail = list(islice(reversed(deltas), wanted))
+        tail.reverse()
+        return tail
     
     def get(self, seq: int) -> NandaAgentFactsDelta | None:
         """Get a specific delta by sequence number.
@@ -111,34 +220,60 @@ class DeltaStore:
         Returns:
             The delta if found, None otherwise
         """
-        with self._lock:
-            for d in self._deltas:
-                if d.seq == seq:
-                    return d
+        if not 0 < seq <= self._seq:
             return None
+        return self._read(self._lookup, seq)
+    
+    def _lookup(self, seq: int) -> NandaAgentFactsDelta | None:
+        """Find a delta by seq arithmetic, checking the seq of the hit."""
+        deltas = self._deltas
+        if not deltas:
+            return None
+        index = seq - deltas[0].seq
+        if not 0 <= index < len(deltas):
+            return None
+        delta = deltas[index]
+        return delta if delta.seq == seq else None
+    
+    def _sign(self, delta: NandaAgentFactsDelta) -> dict[str, Any] | None:
+        """Compute the signature for a new delta. Override in subclass.
+        
+        Called under the write lock with the complete, unsigned delta before
+        it is stored; return None to leave the delta unsigned.
+        """
+        return None
+    
+    def _signed(self, delta: NandaAgentFactsDelta) -> NandaAgentFactsDelta:
+        """Attach the _sign result to a new delta."""
+        signature = self._sign(delta)
+        if signature is None:
+            return delta
+        return delta.model_copy(update={"signature": signature})
+    
+    # The readers below take no lock: reading one attribute is atomic, and the
+    # values are snapshots that a concurrent add may advance right after
     
     @property
     def next_seq(self) -> int:
         """Get the next sequence number that will be assigned."""
-        with self._lock:
-            return self._seq + 1
+        return self._seq + 1
     
     @property
     def current_seq(self) -> int:
         """Get the current (most recent) sequence number."""
-        with self._lock:
-            return self._seq
+        return self._seq
     
     def clear(self) -> None:
         """Clear all deltas (useful for testing)."""
         with self._lock:
+            self._version += 1
             self._seq = 0
-            self._deltas = []
+            self._deltas.clear()
+            self._version += 1
     
     def __len__(self) -> int:
         """Return the number of stored deltas."""
-        with self._lock:
-            return len(self._deltas)
+        return len(self._deltas)
 
 
 class PersistentDeltaStore(DeltaStore):
@@ -163,27 +298,101 @@ class PersistentDeltaStore(DeltaStore):
             def _load_since(self, seq: int) -> list[NandaAgentFactsDelta]:
                 # SELECT * FROM nanda_deltas WHERE seq > ...
                 pass
+    
+    Pass persist_workers to run the per-delta _persist calls of add_batch
+    concurrently (for I/O-bound backends whose _persist is thread-safe).
+    The pool's threads live until close() is called, so close the store
+    when done with it, or use it as a context manager:
+    
+        with PostgresDeltaStore(dsn, persist_workers=4) as store:
+            store.add_batch(changes)
     """
     
-    def add(self, action: str, agent: NandaAgentFacts) -> NandaAgentFactsDelta:
+    def __init__(
+        self,
+        max_deltas: int = 10000,
+        thread_safe: bool = True,
+        persist_workers: int | None = None,
+    ):
+        """Initialize the persistent delta store.
+        
+        Args:
+            max_deltas: Maximum number of deltas to keep in memory
+            thread_safe: Lock around writes (see DeltaStore)
+            persist_workers: Thread pool size for persisting batches;
+                None persists them one after another in the caller's thread.
+                Call close() to shut the pool down.
+        """
+        super().__init__(max_deltas=max_deltas, thread_safe=thread_safe)
+        self._persist_pool = (
+            ThreadPoolExecutor(max_workers=persist_workers, thread_name_prefix="nanda-persist")
+            if persist_workers
+            else None
+        )
+    
+    def close(self) -> None:
+        """Shut down the persist pool, waiting for pending writes.
+        
+        Later batches are persisted inline in the caller's thread.
+        """
+        pool, self._persist_pool = self._persist_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+    
+    def __enter__(self) -> PersistentDeltaStore:
+        return self
+    
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+    
+    def add(self, action: DeltaAction | str, agent: NandaAgentFacts) -> NandaAgentFactsDelta:
         """Record a delta and persist it."""
         delta = super().add(action, agent)
         self._persist(delta)
         return delta
     
+    def add_batch(
+        self,
+        items: Iterable[tuple[DeltaAction | str, NandaAgentFacts]],
+    ) -> list[NandaAgentFactsDelta]:
+        """Record several deltas and persist them together."""
+        deltas = super().add_batch(items)
+        self._persist_batch(deltas)
+        return deltas
+    
     def since(self, seq: int) -> list[NandaAgentFactsDelta]:
-        """Load deltas from persistent storage."""
-        # Try persistent storage first
-        persisted = self._load_since(seq)
-        if persisted:
-            return persisted
-        # Fall back to in-memory
-        return super().since(seq)
+        """Load deltas from persistent storage.
+        
+        Storage is authoritative: an empty result means there are no newer
+        deltas, not that the in-memory window should be consulted.
+        """
+        return self._load_since(seq)
     
     def _persist(self, delta: NandaAgentFactsDelta) -> None:
         """Persist a delta to storage. Override in subclass."""
         pass
     
+    def _persist_batch(self, deltas: list[NandaAgentFactsDelta]) -> None:
+        """Persist several deltas to storage.
+        
+        Defaults to one _persist call per delta, fanned out over the persist
+        pool when there is one; override to write them in a single statement
+        or transaction.
+        """
+        pool = self._persist_pool
+        if pool is None or len(deltas) < 2:
+            for delta in deltas:
+                self._persist(delta)
+            return
+        futures = [pool.submit(self._persist, delta) for delta in deltas]
+        # Let every write finish before re-raising the first failure
+        wait(futures)
+        for future in futures:
+            future.result()
+    
     def _load_since(self, seq: int) -> list[NandaAgentFactsDelta]:
-        """Load deltas from storage. Override in subclass."""
-        return []
+        """Load deltas from storage. Override in subclass.
+        
+        Defaults to the in-memory window, for subclasses that only persist.
+        """
+        return super().since(seq)
@@ -1,15 +1,27 @@
+import subprocess
+import sys
+import threading
+import time
+from datetime import UTC, datetime
+
 import pytest
-from fastapi import HTTPException
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
 
 from nanda_bridge import (
+    DeltaAction,
     DeltaStore,
     NandaBridge,
     NandaAgentFacts,
+    NandaAgentFactsDeltaResponse,
+    NandaAgentFactsIndexResponse,
     SimpleAgent,
     SimpleAgentConverter,
 )
+from nanda_bridge.converter import _did_domain
 from nanda_bridge.models import NandaTool
-from nanda_bridge.router import _parse_agent_identifier, create_nanda_router
+from nanda_bridge import router as router_module
+from nanda_bridge.router import _coarse_now, _parse_agent_identifier, create_nanda_router
 from nanda_bridge.store import PersistentDeltaStore
 
 
@@ -90,6 +102,75 @@ def test_converter_ext_metadata_dynamic_and_proof():
     assert facts.proof["method"] == "sha256"
 
 
+def test_converter_to_nanda_batch_matches_single_conversion():
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    agents = [
+        SimpleAgent(id=f"batch-{i}", name=f"Batch {i}", description="batched")
+        for i in range(3)
+    ]
+
+    batch = converter.to_nanda_batch(agents)
+
+    assert [facts.id for facts in batch] == [converter.to_nanda(a).id for a in agents]
+    assert converter.to_nanda_batch([]) == []
+
+
+def test_converter_caches_facts_until_reregistered():
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    agent = SimpleAgent(id="cached", name="Cached", description="v1")
+    converter.register(agent)
+
+    first = converter.to_nanda(agent)
+    assert converter.to_nanda(agent) is first
+
+    updated = SimpleAgent(id="cached", name="Cached", description="v2")
+    assert converter.to_nanda(updated).description == "v2"
+    assert converter.to_nanda(agent) is first
+
+    converter.register(updated)
+    assert converter.to_nanda(updated).description == "v2"
+    assert converter.to_nanda(agent) is not first
+
+
+def test_converter_caches_json_until_unregistered():
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    agent = SimpleAgent(id="cached-json", name="Cached", description="v1")
+    converter.register(agent)
+
+    payload = converter.to_nanda_json(agent)
+    assert converter.to_nanda_json(agent) is payload
+
+    converter.unregister(agent.id)
+    assert converter.to_nanda_json(agent) is not payload
+    assert converter.to_nanda_json(agent) == payload
+
+
+def test_converter_to_nanda_json_roundtrips():
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    agent = SimpleAgent(id="json-agent", name="JSON Agent", description="serialized")
+
+    payload = converter.to_nanda_json(agent)
+
+    assert isinstance(payload, bytes)
+    assert NandaAgentFacts.model_validate_json(payload) == converter.to_nanda(agent)
+
+
 def test_delta_store_pruning_get_and_clear():
     store = DeltaStore(max_deltas=2)
     facts = _make_agent_facts("prune-me")
@@ -140,6 +221,66 @@ def test_persistent_delta_store_paths():
 
     assert store.since(delta.seq) == []
 
+    # An empty persisted result is authoritative, even with deltas in memory
+    store._load_returns.append([])
+    assert store.since(0) == []
+    assert store.since(0) == [delta]
+
+
+def test_delta_store_add_batch_prunes_once():
+    store = DeltaStore(max_deltas=3)
+    facts = _make_agent_facts("batch")
+
+    deltas = store.add_batch([("upsert", facts)] * 4 + [("delete", facts)])
+    assert [d.seq for d in deltas] == [1, 2, 3, 4, 5]
+    assert deltas[-1].action == "delete"
+    assert len({d.recorded_at for d in deltas}) == 1
+    assert [d.seq for d in store.since(0)] == [3, 4, 5]
+    assert store.next_seq == 6
+
+
+def test_persistent_delta_store_add_batch_persists_all():
+    store = DummyPersistentStore()
+    facts = _make_agent_facts("persistent-batch")
+
+    deltas = store.add_batch([("upsert", facts), ("delete", facts)])
+    assert store.persisted == deltas
+
+
+def test_persistent_delta_store_add_batch_with_persist_pool():
+    persisted = []
+
+    class PooledStore(PersistentDeltaStore):
+        def _persist(self, delta):
+            persisted.append(delta.seq)
+
+    facts = _make_agent_facts("pooled-batch")
+    with PooledStore(persist_workers=4) as store:
+        deltas = store.add_batch([("upsert", facts)] * 8)
+        assert sorted(persisted) == [d.seq for d in deltas]
+    assert store._persist_pool is None
+
+    # A closed store keeps persisting, inline
+    more = store.add_batch([("delete", facts)] * 2)
+    assert persisted[-2:] == [d.seq for d in more]
+
+
+def test_persistent_delta_store_pooled_batch_failure_waits_for_writes():
+    persisted = []
+
+    class FlakyStore(PersistentDeltaStore):
+        def _persist(self, delta):
+            if delta.seq == 1:
+                raise OSError("disk full")
+            time.sleep(0.05)
+            persisted.append(delta.seq)
+
+    with FlakyStore(persist_workers=4) as store:
+        with pytest.raises(OSError):
+            store.add_batch([("upsert", _make_agent_facts("flaky"))] * 4)
+        # Every other write finished before the failure surfaced
+        assert sorted(persisted) == [2, 3, 4]
+
 
 def _build_router(converter=None, delta_store=None, tools=None):
     converter = converter or SimpleAgentConverter(
@@ -176,6 +317,37 @@ def test_index_filters_private_and_lists_public():
     assert data["agents"][0]["id"].endswith("public")
 
 
+def test_index_pages_over_public_agents():
+    router, converter, _ = _build_router()
+    converter.register(SimpleAgent(id="public-1", name="Public 1", description="pub"))
+    converter.register(SimpleAgent(id="private", name="Private", description="priv", public=False))
+    converter.register(SimpleAgent(id="public-2", name="Public 2", description="pub"))
+    converter.register(SimpleAgent(id="public-3", name="Public 3", description="pub"))
+
+    assert [a.id for a in converter.list_public_agents(limit=2, offset=1)] == ["public-2", "public-3"]
+
+    index_route = next(r for r in router.routes if r.path.endswith("/index"))
+    data = index_route.endpoint(limit=2, offset=0).model_dump()
+
+    assert [a["agent_name"] for a in data["agents"]] == ["Public 1", "Public 2"]
+
+
+def test_index_ndjson_streams_public_agents():
+    router, converter, _ = _build_router()
+    converter.register(SimpleAgent(id="public", name="Public", description="pub"))
+    converter.register(SimpleAgent(id="private", name="Private", description="priv", public=False))
+    converter.register(SimpleAgent(id="other", name="Other", description="pub"))
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).get("/nanda/index.ndjson")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.content.splitlines()
+    assert [NandaAgentFacts.model_validate_json(line).agent_name for line in lines] == ["Public", "Other"]
+
+
 def test_resolve_not_found_and_not_public():
     router, converter, _ = _build_router()
     private_agent = SimpleAgent(id="private", name="Private", description="priv", public=False, namespace="ns")
@@ -269,6 +441,27 @@ def test_bridge_unregister_records_delete_and_add_tool():
     assert bridge.wellknown.tools_url is not None
 
 
+def test_wellknown_is_cached_until_tools_change():
+    bridge = NandaBridge(
+        registry_id="wellknown-test",
+        provider_name="Bridge",
+        provider_url="https://bridge.test",
+    )
+    wellknown_route = next(r for r in bridge.router.routes if "well-known" in r.path)
+
+    first = wellknown_route.endpoint()
+    assert wellknown_route.endpoint() is first
+    assert first.tools_url is None
+    assert bridge.wellknown is bridge.wellknown
+
+    bridge.add_tool(NandaTool(tool_id="late-tool", description="Tool", endpoint="https://tool.test"))
+
+    updated = wellknown_route.endpoint()
+    assert updated.tools_url is not None
+    assert "mcp-tools" in updated.capabilities
+    assert bridge.wellknown.tools_url is not None
+
+
 def test_bridge_accepts_custom_converter_branch():
     custom_converter = SimpleAgentConverter(
         registry_id="custom-registry",
@@ -285,3 +478,370 @@ def test_bridge_accepts_custom_converter_branch():
     )
     assert bridge.converter is custom_converter
     assert bridge.delta_store is custom_store
+
+
+def test_coarse_now_shares_timestamp_within_tick(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(router_module.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(router_module, "_now_cache", (float("-inf"), router_module._now_cache[1]))
+
+    first = _coarse_now()
+    clock[0] += router_module._NOW_TICK / 2
+    assert _coarse_now() is first
+
+    clock[0] += router_module._NOW_TICK
+    assert _coarse_now() is not first
+
+
+def test_simple_agent_from_json():
+    agent = SimpleAgent.from_json(
+        b'{"id": "json-agent", "name": "JSON Agent", "description": "From JSON", "labels": ["chat"]}'
+    )
+    assert isinstance(agent, SimpleAgent)
+    assert agent.id == "json-agent"
+    assert agent.labels == ["chat"]
+    assert agent.namespace == "default"
+
+    with pytest.raises(ValueError):
+        SimpleAgent.from_json(b'{"id": "missing-fields"}')
+
+
+def test_bridge_register_agent_json():
+    bridge = NandaBridge(
+        registry_id="json-registry",
+        provider_name="JSON",
+        provider_url="https://json.test",
+    )
+    facts = bridge.register_agent_json('{"id": "json-agent", "name": "JSON Agent", "description": "From JSON"}')
+    assert facts.agent_name == "JSON Agent"
+    assert bridge.converter.get_agent("json-agent") is not None
+    assert bridge.delta_store.since(0)[0].action == "upsert"
+
+
+def test_bridge_register_agent_json_requires_simple_converter():
+    class CustomConverter:
+        def to_nanda(self, agent):
+            raise NotImplementedError
+
+        def list_agents(self, limit=100, offset=0):
+            return iter(())
+
+        def get_agent(self, agent_id):
+            return None
+
+        def is_public(self, agent):
+            return True
+
+    bridge = NandaBridge(
+        registry_id="custom-registry",
+        provider_name="Custom",
+        provider_url="https://custom.test",
+        converter=CustomConverter(),
+    )
+    with pytest.raises(TypeError):
+        bridge.register_agent_json(b"{}")
+
+
+def test_closed_vocabularies_are_validated():
+    facts = _make_agent_facts()
+    with pytest.raises(ValueError):
+        DeltaStore().add("rename", facts)
+
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    with pytest.raises(ValueError):
+        converter.to_nanda(SimpleAgent(id="a", name="A", description="A", certification_level="gold"))
+
+
+def test_response_envelopes_do_not_revalidate_agents():
+    facts = _make_agent_facts()
+    index = NandaAgentFactsIndexResponse(
+        generated_at=datetime.now(UTC),
+        registry_id="test-registry",
+        agents=[facts],
+    )
+    assert index.agents[0] is facts
+
+    delta = DeltaStore().add("upsert", facts)
+    response = NandaAgentFactsDeltaResponse(
+        registry_id="test-registry",
+        generated_at=datetime.now(UTC),
+        deltas=[delta],
+        next_seq=2,
+    )
+    assert response.deltas[0] is delta
+    assert response.deltas[0].agent is facts
+
+
+def test_default_namespaces_strip_scheme():
+    bridge = NandaBridge(
+        registry_id="ns-registry",
+        provider_name="NS",
+        provider_url="http://plain.test",
+    )
+    assert bridge.wellknown.namespaces == ["did:web:plain.test:*"]
+    assert bridge.wellknown.registry_did == "did:web:plain.test"
+
+
+def test_bridge_unregister_private_agent_skips_conversion(monkeypatch):
+    bridge = NandaBridge(
+        registry_id="private-registry",
+        provider_name="Private",
+        provider_url="https://private.test",
+    )
+    bridge.register_agent(SimpleAgent(id="hidden", name="Hidden", description="priv", public=False))
+
+    def fail(agent):
+        raise AssertionError("private agents should not be converted on unregister")
+
+    monkeypatch.setattr(bridge.converter, "to_nanda", fail)
+    bridge.unregister_agent("hidden")
+    assert bridge.converter.get_agent("hidden") is None
+    assert bridge.delta_store.since(0) == []
+
+
+def test_delta_action_enum_round_trip():
+    store = DeltaStore()
+    delta = store.add("delete", _make_agent_facts())
+    assert delta.action is DeltaAction.DELETE
+    assert delta.action == "delete"
+    assert '"action":"delete"' in delta.model_dump_json()
+
+
+def test_delta_store_since_after_pruning():
+    store = DeltaStore(max_deltas=3)
+    facts = _make_agent_facts("since")
+    store.add_batch([("upsert", facts)] * 5)
+
+    assert [d.seq for d in store.since(0)] == [3, 4, 5]
+    assert [d.seq for d in store.since(3)] == [4, 5]
+    assert store.since(5) == []
+    assert store.since(50) == []
+    assert DeltaStore().since(0) == []
+
+
+def test_delta_store_failed_add_leaves_seq_unchanged():
+    store = DeltaStore()
+    facts = _make_agent_facts("gapless")
+    store.add("upsert", facts)
+
+    with pytest.raises(ValueError):
+        store.add_batch([("upsert", facts), ("rename", facts)])
+    with pytest.raises(ValueError):
+        store.add("rename", facts)
+
+    assert store.current_seq == 1
+    assert store.add("delete", facts).seq == 2
+    assert store.get(2).action == "delete"
+
+
+def test_recorded_deltas_are_frozen():
+    delta = DeltaStore().add("upsert", _make_agent_facts("frozen"))
+    with pytest.raises(ValueError):
+        delta.action = "delete"
+    signed = delta.model_copy(update={"signature": {"alg": "none"}})
+    assert signed.signature == {"alg": "none"}
+    assert delta.signature is None
+
+
+def test_delta_store_sign_hook_signs_stored_deltas():
+    class SigningStore(DeltaStore):
+        def _sign(self, delta):
+            return {"alg": "test", "seq": delta.seq, "action": str(delta.action)}
+
+    store = SigningStore()
+    facts = _make_agent_facts("signed")
+    single = store.add("upsert", facts)
+    batch = store.add_batch([("delete", facts)])
+
+    assert single.signature == {"alg": "test", "seq": 1, "action": "upsert"}
+    assert batch[0].signature == {"alg": "test", "seq": 2, "action": "delete"}
+    assert store.since(0) == [single, batch[0]]
+    assert store.get(2) is batch[0]
+
+
+def test_single_writer_delta_store_without_lock():
+    store = DeltaStore(max_deltas=2, thread_safe=False)
+    facts = _make_agent_facts("single-writer")
+    store.add("upsert", facts)
+    store.add_batch([("upsert", facts), ("delete", facts)])
+    assert [d.seq for d in store.since(0)] == [2, 3]
+    assert store.get(3).action == "delete"
+    store.clear()
+    assert len(store) == 0
+
+
+def test_single_writer_delta_store_reads_while_writing():
+    # Switch threads as often as possible so reads overlap the writer
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    store = DeltaStore(max_deltas=50, thread_safe=False)
+    facts = _make_agent_facts("concurrent")
+    store.add("upsert", facts)
+    done = threading.Event()
+    errors = []
+
+    def write():
+        for _ in range(20000):
+            store.add("upsert", facts)
+        done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                current = store.current_seq
+                seqs = [d.seq for d in store.since(current - 40)]
+                assert seqs[0] >= max(current - 39, 1)
+                assert seqs == list(range(seqs[0], seqs[0] + len(seqs)))
+                delta = store.get(current - 20)
+                assert delta is None or delta.seq == current - 20
+        except Exception as exc:
+            errors.append(exc)
+
+    reader = threading.Thread(target=read)
+    writer = threading.Thread(target=write)
+    try:
+        reader.start()
+        writer.start()
+        writer.join()
+        reader.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert store.current_seq == 20001
+
+
+def test_single_writer_delta_store_retries_instead_of_unlocked_fallback(monkeypatch):
+    store = DeltaStore(thread_safe=False)
+    store.add("upsert", _make_agent_facts("retry"))
+    slice_since = store._slice_since
+    collisions = iter(range(5))
+
+    def racing_slice(seq):
+        # Fail as a read overlapping the writer would, past the optimistic budget
+        if next(collisions, None) is not None:
+            raise RuntimeError("deque mutated during iteration")
+        return slice_since(seq)
+
+    monkeypatch.setattr(store, "_slice_since", racing_slice)
+    assert [d.seq for d in store.since(0)] == [1]
+
+
+def test_converted_facts_do_not_share_default_sub_models():
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    first = converter.to_nanda(SimpleAgent(id="first", name="First", description="one"))
+    second = converter.to_nanda(SimpleAgent(id="second", name="Second", description="two"))
+
+    assert first.capabilities.authentication is not second.capabilities.authentication
+    assert first.skills[0] is not second.skills[0]
+
+    first.capabilities.authentication.methods.append("jwt")
+    first.skills[0].inputModes.append("image")
+    third = converter.to_nanda(SimpleAgent(id="third", name="Third", description="three"))
+    for facts in (second, third):
+        assert facts.capabilities.authentication.methods == ["did-auth"]
+        assert facts.skills[0].inputModes == ["text"]
+
+
+def test_converted_facts_do_not_share_default_certification():
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    first = converter.to_nanda(SimpleAgent(id="first", name="First", description="one"))
+    first.certification.attestations.append("POISON")
+
+    other = converter.to_nanda(SimpleAgent(id="other", name="Other", description="two"))
+    assert other.certification.attestations == []
+    assert other.certification.issuer == "Test Provider"
+
+
+def test_converted_facts_do_not_share_provider():
+    converter = SimpleAgentConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    first = converter.to_nanda(SimpleAgent(id="first", name="First", description="one"))
+    second = converter.to_nanda(SimpleAgent(id="second", name="Second", description="two"))
+    assert first.provider is not second.provider
+
+    first.provider.name = "Renamed"
+    assert second.provider.name == "Test Provider"
+    assert converter.to_nanda(SimpleAgent(id="third", name="Third", description="three")).provider.name == "Test Provider"
+
+
+def test_did_domain_keeps_path_and_drops_userinfo():
+    path_bridge = NandaBridge(
+        registry_id="path-registry",
+        provider_name="Path",
+        provider_url="https://p.com/sub",
+    )
+    facts = path_bridge.register_agent(SimpleAgent(id="a", name="A", description="A"))
+    assert facts.id == "did:web:p.com/sub:agents:default:a"
+    assert facts.provider.did == "did:web:p.com/sub"
+    assert path_bridge.wellknown.namespaces == ["did:web:p.com/sub:*"]
+    assert path_bridge.wellknown.registry_did == "did:web:p.com/sub"
+
+    userinfo_bridge = NandaBridge(
+        registry_id="userinfo-registry",
+        provider_name="Userinfo",
+        provider_url="https://user:pw@p.com:8443",
+    )
+    facts = userinfo_bridge.register_agent(SimpleAgent(id="a", name="A", description="A"))
+    assert facts.id == "did:web:p.com:8443:agents:default:a"
+    assert userinfo_bridge.wellknown.namespaces == ["did:web:p.com:8443:*"]
+    assert userinfo_bridge.wellknown.registry_did == "did:web:p.com:8443"
+
+    # Ports are kept as written, even when they do not parse
+    assert _did_domain("http://localhost:8000") == "localhost:8000"
+    assert _did_domain("http://host:abc/x") == "host:abc/x"
+
+
+def test_list_public_agents_respects_is_public_override():
+    class LabelGatedConverter(SimpleAgentConverter):
+        def is_public(self, agent):
+            return agent.public and "listed" in agent.labels
+
+    converter = LabelGatedConverter(
+        registry_id="test-registry",
+        provider_name="Test Provider",
+        provider_url="https://test.com",
+    )
+    converter.register(SimpleAgent(id="listed", name="L", description="l", labels=["listed"]))
+    converter.register(SimpleAgent(id="unlisted", name="U", description="u"))
+    assert [a.id for a in converter.list_public_agents()] == ["listed"]
+
+
+def test_router_module_is_imported_lazily():
+    code = (
+        "import sys, nanda_bridge\n"
+        "assert 'nanda_bridge.router' not in sys.modules\n"
+        "assert nanda_bridge.router.NandaBridge is nanda_bridge.NandaBridge\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_register_agent_returns_a_private_copy():
+    bridge = NandaBridge(
+        registry_id="copy-registry",
+        provider_name="Copy",
+        provider_url="https://copy.test",
+    )
+    facts = bridge.register_agent(SimpleAgent(id="copy", name="Copy", description="c"))
+    facts.label = "changed"
+    facts.skills[0].description = "changed"
+
+    served = bridge.converter.to_nanda(bridge.converter.get_agent("copy"))
+    assert served.label == "default"
+    assert served.skills[0].description != "changed"
+    assert bridge.delta_store.get(1).agent.label == "default"